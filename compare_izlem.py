@@ -5,28 +5,20 @@ import sys
 sys.path.insert(0, '.')
 
 import numpy as np
-from src.topology import build_graph, extract_features, features_to_topo_bytes
+from src.topology import edge_pairs, extract_features, features_to_topo_bytes
 from src.permutation import get_permutations
 from src.sbox import get_sbox_pair
 from src.advanced_analysis import full_advanced_analysis, compare_analyses
 
 def create_sbox_with_rounds(seed: str, rounds: int) -> np.ndarray:
     """Belirtilen round sayısıyla S-box üret."""
-    import hashlib
     import networkx as nx
     
-    # Graf oluştur (manuel, round sayısı kontrolü için)
+    # Graf oluştur (round sayısı kontrolü için); build_graph ile aynı çiftler,
+    # aynı ekleme sırası — 48 turda build_graph(seed) ile birebir aynı graf
     G = nx.Graph()
     G.add_nodes_from(range(256))
-    current_hash = seed.encode('utf-8')
-    
-    for round_num in range(rounds):
-        h = hashlib.sha512(current_hash + round_num.to_bytes(1, 'big')).digest()
-        for i in range(0, 64, 2):
-            u, v = h[i], h[i + 1]
-            if u != v:
-                G.add_edge(u, v)
-        current_hash = h
+    G.add_edges_from(edge_pairs(seed, rounds).tolist())
     
     print(f"[Graf] Rounds: {rounds}, Edges: {G.number_of_edges()}")
     
@@ -5,17 +5,41 @@ S-box ve sistem güvenliğini ölçen ileri metrikler.
 """
 
 import numpy as np
-from typing import Dict, Tuple
-from collections import Counter
+from typing import Dict, NamedTuple, Tuple, Union
 import sys
 sys.path.insert(0, '.')
 
+from src.analysis import _ddt_cached, _sbox_key
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 0. ORTAK S-BOX GÖRÜNÜMÜ
+# ═══════════════════════════════════════════════════════════════════════════
+
+class _SboxView(NamedTuple):
+    """Metriklerin paylaştığı, bir kez hesaplanan S-box temsilleri."""
+    sbox_u8: np.ndarray           # (256,) uint8
+    matrix_16x16: np.ndarray      # (16, 16) uint8 görünüm
+    output_bits_256x8: np.ndarray  # (256, 8) uint8, bit 0 = LSB
+
+
+def _sbox_view(sbox: Union[np.ndarray, _SboxView]) -> _SboxView:
+    """S-box'tan (gerekirse) ortak görünümü üret."""
+    if isinstance(sbox, _SboxView):
+        return sbox
+    sb = np.ascontiguousarray(sbox, dtype=np.uint8)
+    return _SboxView(
+        sbox_u8=sb,
+        matrix_16x16=sb.reshape((16, 16)),
+        output_bits_256x8=np.unpackbits(sb[:, None], axis=1, bitorder='little'),
+    )
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # 1. OTOKORELASYON MATRİSİ
 # ═══════════════════════════════════════════════════════════════════════════
 
-def autocorrelation_matrix(sbox: np.ndarray) -> Tuple[np.ndarray, float]:
+def autocorrelation_matrix(sbox: Union[np.ndarray, _SboxView]) -> Tuple[np.ndarray, float]:
     """
     S-box'ın uzamsal otokorelasyonunu hesapla.
     
@@ -25,19 +49,13 @@ def autocorrelation_matrix(sbox: np.ndarray) -> Tuple[np.ndarray, float]:
     Returns:
         (correlation_matrix, average_correlation)
     """
-    matrix = sbox.reshape((16, 16)).astype(np.float64)
+    matrix = _sbox_view(sbox).matrix_16x16.astype(np.float64)
     
     # Yatay korelasyon (her satırda komşu hücreler)
-    h_corr = np.zeros((16, 15))
-    for i in range(16):
-        for j in range(15):
-            h_corr[i, j] = abs(matrix[i, j] - matrix[i, j+1]) / 255.0
+    h_corr = np.abs(np.diff(matrix, axis=1)) / 255.0
     
     # Dikey korelasyon (her sütunda komşu hücreler)
-    v_corr = np.zeros((15, 16))
-    for i in range(15):
-        for j in range(16):
-            v_corr[i, j] = abs(matrix[i, j] - matrix[i+1, j]) / 255.0
+    v_corr = np.abs(np.diff(matrix, axis=0)) / 255.0
     
     # Ortalama "benzemezlik" (1 = tamamen farklı, 0 = aynı)
     avg_h = np.mean(h_corr)
@@ -54,30 +72,25 @@ def autocorrelation_matrix(sbox: np.ndarray) -> Tuple[np.ndarray, float]:
 # 2. SHANNON ENTROPİSİ
 # ═══════════════════════════════════════════════════════════════════════════
 
-def shannon_entropy(sbox: np.ndarray) -> float:
+def shannon_entropy(sbox: Union[np.ndarray, _SboxView]) -> float:
     """
     S-box'ın bit düzeyinde Shannon entropisi.
     
     İdeal: 8.0 bit (tam rastgele)
     """
     # Byte dağılımı
-    counter = Counter(sbox)
-    total = len(sbox)
-    
-    entropy = 0.0
-    for count in counter.values():
-        if count > 0:
-            p = count / total
-            entropy -= p * np.log2(p)
+    sb = _sbox_view(sbox).sbox_u8
+    counts = np.bincount(sb, minlength=256)
+    p = counts[counts > 0] / sb.size
     
-    return entropy
+    return float(-(p * np.log2(p)).sum())
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # 3. SAC - STRICT AVALANCHE CRITERION
 # ═══════════════════════════════════════════════════════════════════════════
 
-def sac_test(sbox: np.ndarray) -> Tuple[float, np.ndarray]:
+def sac_test(sbox: Union[np.ndarray, _SboxView]) -> Tuple[float, np.ndarray]:
     """
     Strict Avalanche Criterion testi.
     
@@ -87,37 +100,36 @@ def sac_test(sbox: np.ndarray) -> Tuple[float, np.ndarray]:
     Returns:
         (overall_sac_score, bit_flip_matrix[8x8])
     """
+    flip_matrix = _sac_matrix(_sbox_view(sbox).output_bits_256x8)
+    return _sac_score(flip_matrix), flip_matrix
+
+
+def _sac_matrix(output_bits: np.ndarray) -> np.ndarray:
+    """(256, 8) çıkış bitlerinden 8x8 bit değişim oranı matrisi."""
+    x = np.arange(256)
     flip_counts = np.zeros((8, 8), dtype=np.float64)
     
-    for x in range(256):
-        output_x = sbox[x]
-        
-        # Her giriş bitini tek tek değiştir
-        for input_bit in range(8):
-            x_flipped = x ^ (1 << input_bit)
-            output_flipped = sbox[x_flipped]
-            
-            # Çıkıştaki değişen bitleri say
-            diff = output_x ^ output_flipped
-            for output_bit in range(8):
-                if diff & (1 << output_bit):
-                    flip_counts[input_bit, output_bit] += 1
+    # Her giriş bitini tek tek değiştir (256 girişin hepsi birden)
+    for input_bit in range(8):
+        # Çıkıştaki değişen bitleri say
+        flipped = output_bits ^ output_bits[x ^ (1 << input_bit)]
+        flip_counts[input_bit] = flipped.sum(axis=0)
     
     # Normalize (0-1 arası, ideal 0.5)
-    flip_matrix = flip_counts / 256.0
-    
-    # SAC skoru: 0.5'e olan ortalama yakınlık
+    return flip_counts / 256.0
+
+
+def _sac_score(flip_matrix: np.ndarray) -> float:
+    """SAC skoru: 0.5'e olan ortalama yakınlık (1.0 = mükemmel)."""
     sac_deviation = np.abs(flip_matrix - 0.5)
-    sac_score = 1 - (2 * np.mean(sac_deviation))  # 1.0 = mükemmel
-    
-    return sac_score, flip_matrix
+    return 1 - (2 * np.mean(sac_deviation))
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # 4. BIC - BIT INDEPENDENCE CRITERION
 # ═══════════════════════════════════════════════════════════════════════════
 
-def bic_test(sbox: np.ndarray) -> Tuple[float, np.ndarray]:
+def bic_test(sbox: Union[np.ndarray, _SboxView]) -> Tuple[float, np.ndarray]:
     """
     Bit Independence Criterion testi.
     
@@ -127,30 +139,39 @@ def bic_test(sbox: np.ndarray) -> Tuple[float, np.ndarray]:
     Returns:
         (independence_score, correlation_matrix[8x8])
     """
-    # Her giriş için çıkış bitlerini topla
-    output_bits = np.zeros((256, 8), dtype=np.uint8)
-    for x in range(256):
-        for bit in range(8):
-            output_bits[x, bit] = (sbox[x] >> bit) & 1
+    corr_matrix = _bic_matrix(_sbox_view(sbox).output_bits_256x8)
+    return _bic_score(corr_matrix), corr_matrix
+
+
+def _bic_matrix(output_bits: np.ndarray) -> np.ndarray:
+    """(256, 8) çıkış bitlerinden 8x8 bitler arası korelasyon matrisi."""
+    # Her çıkış biti için 256 girişlik bit kanalı (8, 256) — satırlar bitişik
+    bits_t = np.ascontiguousarray(output_bits.T)
+    signs = 1.0 - 2.0 * bits_t  # (-1)^b
     
     # Bitler arası korelasyon matrisi
-    corr_matrix = np.zeros((8, 8), dtype=np.float64)
-    for i in range(8):
-        for j in range(8):
-            if i == j:
-                corr_matrix[i, j] = 1.0
-            else:
-                # XOR sonucu %50 olmalı (bağımsızlık)
-                xor_result = output_bits[:, i] ^ output_bits[:, j]
-                ones_ratio = np.mean(xor_result)
-                # 0.5'e yakınlık = bağımsızlık
-                corr_matrix[i, j] = abs(ones_ratio - 0.5) * 2
-    
-    # Bağımsızlık skoru (düşük korelasyon = iyi)
+    # XOR sonucu %50 olmalı (bağımsızlık): Σ(-1)^(b_i ⊕ b_j) = 256 - 2·|b_i ⊕ b_j|
+    # |ones_ratio - 0.5| * 2 = |Σ(-1)^(b_i ⊕ b_j)| / 256 (tek GEMM)
+    corr_matrix = np.abs(signs @ signs.T) / 256.0
+    np.fill_diagonal(corr_matrix, 1.0)
+    return corr_matrix
+
+
+def _bic_score(corr_matrix: np.ndarray) -> float:
+    """Bağımsızlık skoru (düşük korelasyon = iyi)."""
     off_diagonal = corr_matrix[np.triu_indices(8, k=1)]
-    independence_score = 1 - np.mean(off_diagonal)
+    return 1 - np.mean(off_diagonal)
+
+
+def sbox_bitstats(sbox: Union[np.ndarray, _SboxView]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    SAC ve BIC matrislerini tek bit açma geçişinde hesapla.
     
-    return independence_score, corr_matrix
+    Returns:
+        (bit_flip_matrix[8x8], correlation_matrix[8x8])
+    """
+    output_bits = _sbox_view(sbox).output_bits_256x8
+    return _sac_matrix(output_bits), _bic_matrix(output_bits)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -160,68 +181,79 @@ def bic_test(sbox: np.ndarray) -> Tuple[float, np.ndarray]:
 def compute_ddt(sbox: np.ndarray) -> np.ndarray:
     """
     Difference Distribution Table hesapla.
-    """
-    ddt = np.zeros((256, 256), dtype=np.int32)
-    
-    for x in range(256):
-        for delta_in in range(256):
-            delta_out = sbox[x] ^ sbox[x ^ delta_in]
-            ddt[delta_in, delta_out] += 1
     
-    return ddt
+    analysis.py ile aynı önbelleği paylaşır; aynı S-box için tablo
+    yeniden hesaplanmaz.
+    """
+    return _ddt_cached(_sbox_key(sbox)).copy()
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # KAPSAMLI ANALİZ
 # ═══════════════════════════════════════════════════════════════════════════
 
-def full_advanced_analysis(sbox: np.ndarray, label: str = "S-box") -> Dict:
+def full_advanced_analysis(sbox: np.ndarray, label: str = "S-box",
+                           return_matrices: bool = False) -> Dict:
     """
     Tüm ileri metrikleri hesapla ve raporla.
+    
+    Args:
+        return_matrices: True ise sac_matrix, bic_matrix ve ddt (256x256)
+            de sonuca eklenir. Varsayılan: sadece skaler metrikler.
     """
     print(f"\n{'='*60}")
     print(f"İLERİ DÜZEY ANALİZ: {label}")
     print(f"{'='*60}")
     
+    # Reshape / bit açma bir kez yapılır, tüm metrikler paylaşır
+    view = _sbox_view(sbox)
+    
     # 1. Otokorelasyon
-    _, autocorr = autocorrelation_matrix(sbox)
+    _, autocorr = autocorrelation_matrix(view)
     print(f"\n[1] Uzamsal Otokorelasyon: {autocorr:.4f}")
     print(f"    (Düşük = İyi, 0.3 altı ideal)")
     
     # 2. Shannon Entropisi
-    entropy = shannon_entropy(sbox)
+    entropy = shannon_entropy(view)
     print(f"\n[2] Shannon Entropisi: {entropy:.4f} bit")
     print(f"    (8.0'a yakın = İyi)")
     
+    # 3-4. SAC ve BIC (aynı bit matrisi üzerinden)
+    sac_matrix, bic_matrix = sbox_bitstats(view)
+    
     # 3. SAC
-    sac_score, sac_matrix = sac_test(sbox)
+    sac_score = _sac_score(sac_matrix)
     print(f"\n[3] SAC Skoru: {sac_score:.4f}")
     print(f"    (1.0'a yakın = Mükemmel)")
     
     # 4. BIC
-    bic_score, bic_matrix = bic_test(sbox)
+    bic_score = _bic_score(bic_matrix)
     print(f"\n[4] BIC Skoru: {bic_score:.4f}")
     print(f"    (1.0'a yakın = Bağımsız bitler)")
     
     # 5. DDT Max (Differential Uniformity)
-    ddt = compute_ddt(sbox)
+    ddt = _ddt_cached(_sbox_key(sbox))
     du = np.max(ddt[1:, :])  # 0 hariç
     print(f"\n[5] Differential Uniformity: {du}")
     print(f"    (4 = AES seviyesi)")
     
     print(f"\n{'='*60}")
     
-    return {
+    result = {
         "label": label,
         "autocorrelation": autocorr,
         "entropy": entropy,
         "sac_score": sac_score,
         "bic_score": bic_score,
         "du": du,
-        "sac_matrix": sac_matrix,
-        "bic_matrix": bic_matrix,
-        "ddt": ddt
     }
+    
+    if return_matrices:
+        result["sac_matrix"] = sac_matrix
+        result["bic_matrix"] = bic_matrix
+        result["ddt"] = ddt.copy()
+    
+    return result
 
 
 def compare_analyses(result1: Dict, result2: Dict) -> None:
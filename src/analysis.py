@@ -5,11 +5,23 @@ S-box ve RNG güvenlik metrikleri.
 """
 
 import numpy as np
-from collections import Counter
 from typing import Dict, Tuple, List
+import functools
 import hashlib
 
 
+def parity8(x: int) -> int:
+    """8-bit değerin parity'si (SWAR indirgeme, dallanmasız)."""
+    x ^= x >> 4
+    x ^= x >> 2
+    x ^= x >> 1
+    return x & 1
+
+
+# 8-bit parity tablosu (LAT hesabında toplu indeksleme için)
+PARITY_LUT = np.array([parity8(i) for i in range(256)], dtype=np.uint8)
+
+
 def compute_ddt(sbox: np.ndarray) -> np.ndarray:
     """
     Difference Distribution Table (DDT) hesapla.
@@ -19,15 +31,33 @@ def compute_ddt(sbox: np.ndarray) -> np.ndarray:
     Differential Uniformity = max(DDT) (0 hariç)
     AES S-box için DU = 4
     """
-    n = len(sbox)
-    ddt = np.zeros((n, n), dtype=np.int32)
-    
-    for x in range(n):
-        for dx in range(n):
-            x2 = x ^ dx  # x' = x ⊕ Δx
-            dy = sbox[x] ^ sbox[x2]  # Δy = S(x) ⊕ S(x')
-            ddt[dx][dy] += 1
+    return _ddt_cached(_sbox_key(sbox)).copy()
+
+
+def _sbox_key(sbox: np.ndarray) -> bytes:
+    """Önbellek anahtarı: S-box'ın uint8 byte temsili."""
+    return np.ascontiguousarray(sbox, dtype=np.uint8).tobytes()
+
+
+@functools.lru_cache(maxsize=4)
+def _ddt_cached(sbox_bytes: bytes) -> np.ndarray:
+    """
+    DDT'yi hesapla ve S-box byte'larına göre önbellekle.
     
+    Dönen tablo salt-okunurdur; değiştirilecekse kopyalanmalı.
+    """
+    n = len(sbox_bytes)
+    sb = np.frombuffer(sbox_bytes, dtype=np.uint8).astype(np.int64)
+    x = np.arange(n)
+    
+    dx = x[:, None]
+    x2 = x[None, :] ^ dx  # x' = x ⊕ Δx
+    dy = sb[None, :] ^ sb[x2]  # Δy = S(x) ⊕ S(x')
+    
+    # (Δx, Δy) çiftlerini tek geçişte say
+    counts = np.bincount((dx * n + dy).ravel(), minlength=n * n)
+    ddt = counts.reshape((n, n)).astype(np.int32)
+    ddt.flags.writeable = False
     return ddt
 
 
@@ -40,7 +70,7 @@ def differential_uniformity(sbox: np.ndarray) -> int:
     Düşük DU = diferansiyel saldırılara daha dayanıklı
     AES: DU = 4 (optimal)
     """
-    ddt = compute_ddt(sbox)
+    ddt = _ddt_cached(_sbox_key(sbox))
     # a = 0 satırını çıkar (identity diffs)
     return int(np.max(ddt[1:, :]))
 
@@ -54,25 +84,35 @@ def compute_lat(sbox: np.ndarray) -> np.ndarray:
     Nonlinearity = 128 - max|LAT|
     """
     n = len(sbox)
-    lat = np.zeros((n, n), dtype=np.int32)
+    sb = np.asarray(sbox, dtype=np.int64)
+    x = np.arange(n)
     
-    def parity(x):
-        """XOR of all bits"""
-        p = 0
-        while x:
-            p ^= (x & 1)
-            x >>= 1
-        return p
+    # f_b(x) = (-1)^(b·S(x)) — satır x, sütun b
+    signs = 1 - 2 * PARITY_LUT[sb[:, None] & x[None, :]].astype(np.int64)
     
-    for a in range(n):
-        for b in range(n):
-            count = 0
-            for x in range(n):
-                if parity(a & x) == parity(b & sbox[x]):
-                    count += 1
-            lat[a][b] = count - (n // 2)
+    # Her sütunun Walsh spektrumu: Σ_x f_b(x)·(-1)^(a·x) = 2·count - n
+    correlation = _fwht(signs)
+    return (correlation // 2).astype(np.int32)
+
+
+def _fwht(arr: np.ndarray) -> np.ndarray:
+    """
+    Fast Walsh–Hadamard Transform (0. eksen boyunca, tüm sütunlar birlikte).
     
-    return lat
+    O(n² log n) — doğrudan korelasyonun O(n³) maliyeti yerine.
+    """
+    out = arr.copy()
+    n = out.shape[0]
+    h = 1
+    while h < n:
+        # Kelebek: (u, v) → (u + v, u - v), h uzaklıktaki çiftler
+        blocks = out.reshape((n // (2 * h), 2, h) + out.shape[1:])
+        u = blocks[:, 0].copy()
+        v = blocks[:, 1]
+        blocks[:, 0] += v
+        blocks[:, 1] = u - v
+        h *= 2
+    return out
 
 
 def nonlinearity(sbox: np.ndarray) -> int:
@@ -84,14 +124,10 @@ def nonlinearity(sbox: np.ndarray) -> int:
     Yüksek NL = lineer saldırılara daha dayanıklı
     AES: NL = 112
     """
-    lat = compute_lat(sbox)
+    lat = np.abs(compute_lat(sbox))
     # (0,0) hariç max
-    max_bias = 0
-    for a in range(len(lat)):
-        for b in range(len(lat)):
-            if a == 0 and b == 0:
-                continue
-            max_bias = max(max_bias, abs(lat[a][b]))
+    lat[0, 0] = 0
+    max_bias = int(lat.max())
     return 128 - max_bias
 
 
@@ -105,26 +141,23 @@ def avalanche_test(crypto_class, seed: str, num_tests: int = 1000) -> Dict:
     
     results = []
     
+    # Sistem bir kez kurulur; testler arasında sadece counter değişir
+    crypto = GraphCrypto(seed)
+    
     for i in range(num_tests):
         # İki farklı counter ile blok üret
-        crypto1 = GraphCrypto(seed)
-        crypto1._counter = i
-        block1 = crypto1.generate_block()
+        crypto._counter = i
+        block1 = crypto.generate_block()
         
-        crypto1._counter = i
         # 1 bit değiştir (counter'da)
-        crypto1._counter = i ^ 1
-        block2 = crypto1.generate_block()
+        crypto._counter = i ^ 1
+        block2 = crypto.generate_block()
         
         # Bit farklarını say
-        bits1 = int.from_bytes(block1, 'big')
-        bits2 = int.from_bytes(block2, 'big')
-        diff = bin(bits1 ^ bits2).count('1')
+        diff_bytes = np.frombuffer(block1, dtype=np.uint8) ^ np.frombuffer(block2, dtype=np.uint8)
+        diff = int(np.unpackbits(diff_bytes).sum())
         
         results.append(diff)
-        
-        if i == 0:
-            break  # Sadece bir test için (hız için)
     
     avg_diff = np.mean(results)
     expected = 64  # 128 bit / 2
@@ -137,6 +170,11 @@ def avalanche_test(crypto_class, seed: str, num_tests: int = 1000) -> Dict:
     }
 
 
+def _unpack_bits(data: bytes) -> np.ndarray:
+    """Byte dizisini MSB-önce bit dizisine aç."""
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+
 def bit_distribution_test(data: bytes) -> Dict:
     """
     Bit dağılımı testi.
@@ -144,7 +182,7 @@ def bit_distribution_test(data: bytes) -> Dict:
     İdeal: %50 sıfır, %50 bir
     """
     total_bits = len(data) * 8
-    ones = sum(bin(b).count('1') for b in data)
+    ones = int(_unpack_bits(data).sum())
     zeros = total_bits - ones
     
     return {
@@ -163,17 +201,18 @@ def byte_distribution_test(data: bytes) -> Dict:
     
     İdeal: Her byte değeri eşit olasılıklı
     """
-    counter = Counter(data)
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+    present = counts[counts > 0]
     expected = len(data) / 256
     
-    chi_sq = sum((counter.get(i, 0) - expected) ** 2 / expected for i in range(256))
+    chi_sq = float(((counts - expected) ** 2 / expected).sum())
     
     return {
-        "unique_bytes": len(counter),
+        "unique_bytes": int(len(present)),
         "expected_per_byte": expected,
         "chi_squared": chi_sq,
-        "min_count": min(counter.values()) if counter else 0,
-        "max_count": max(counter.values()) if counter else 0
+        "min_count": int(present.min()) if len(present) else 0,
+        "max_count": int(present.max()) if len(present) else 0
     }
 
 
@@ -183,23 +222,17 @@ def runs_test(data: bytes) -> Dict:
     
     Çok uzun run'lar = kötü rastgelelik
     """
-    bits = ''.join(format(b, '08b') for b in data)
-    
-    runs = []
-    current_run = 1
+    bits = _unpack_bits(data)
     
-    for i in range(1, len(bits)):
-        if bits[i] == bits[i-1]:
-            current_run += 1
-        else:
-            runs.append(current_run)
-            current_run = 1
-    runs.append(current_run)
+    # Run sınırları: bitin değiştiği pozisyonlar
+    changes = np.flatnonzero(np.diff(bits))
+    boundaries = np.concatenate(([-1], changes, [len(bits) - 1]))
+    runs = np.diff(boundaries)
     
     return {
         "total_runs": len(runs),
         "avg_run_length": np.mean(runs),
-        "max_run_length": max(runs),
+        "max_run_length": int(runs.max()),
         "expected_avg": 2.0  # Beklenen ortalama run uzunluğu
     }
 
@@ -213,8 +246,9 @@ def serial_correlation(data: bytes) -> float:
     if len(data) < 2:
         return 0.0
     
-    x = np.array(list(data[:-1]), dtype=np.float64)
-    y = np.array(list(data[1:]), dtype=np.float64)
+    values = np.frombuffer(data, dtype=np.uint8).astype(np.float64)
+    x = values[:-1]
+    y = values[1:]
     
     if np.std(x) == 0 or np.std(y) == 0:
         return 0.0
@@ -260,9 +294,10 @@ def full_analysis(seed: str, num_blocks: int = 1000, sbox_mode: str = "AFFINE")
     
     # Rastgele bloklar üret
     print(f"\n[4/6] {num_blocks} blok üretiliyor...")
-    blocks = b""
+    blocks_buf = bytearray()
     for _ in range(num_blocks):
-        blocks += crypto.generate_block()
+        blocks_buf.extend(crypto.generate_block())
+    blocks = bytes(blocks_buf)
     
     # Bit dağılımı
     print("\n[5/6] Bit dağılımı analizi...")
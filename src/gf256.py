@@ -4,6 +4,8 @@ GF(2⁸) Aritmetiği
 AES ile aynı indirgenemez polinom: x⁸ + x⁴ + x³ + x + 1 (0x11B)
 """
 
+import numpy as np
+
 # AES indirgenemez polinomu
 IRREDUCIBLE_POLY = 0x11B
 
@@ -13,48 +15,73 @@ def gf_add(a: int, b: int) -> int:
     return a ^ b
 
 
+def _build_log_tables() -> tuple:
+    """
+    Log/antilog tabloları (üreteç g = 0x03).
+    
+    GF_EXP[i] = g^i (512 eleman: log toplamları mod 255 gerektirmez)
+    GF_LOG[g^i] = i
+    """
+    exp = np.zeros(512, dtype=np.int64)
+    log = np.zeros(256, dtype=np.int64)
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        # x × 3 = x ⊕ (x × 2)
+        hi_bit = x & 0x80
+        x2 = (x << 1) & 0xFF
+        if hi_bit:
+            x2 ^= (IRREDUCIBLE_POLY & 0xFF)
+        x ^= x2
+    exp[255:510] = exp[:255]
+    return exp, log
+
+
+GF_EXP, GF_LOG = _build_log_tables()
+
+
 def gf_mul(a: int, b: int) -> int:
     """
     GF(2⁸)'de çarpma
-    AES polinomu ile modüler çarpma
+    log/antilog tablosu ile: a × b = g^(log a + log b)
     """
-    result = 0
-    for _ in range(8):
-        if b & 1:
-            result ^= a
-        hi_bit = a & 0x80
-        a = (a << 1) & 0xFF
-        if hi_bit:
-            a ^= (IRREDUCIBLE_POLY & 0xFF)
-        b >>= 1
-    return result
+    if a == 0 or b == 0:
+        return 0
+    return int(GF_EXP[GF_LOG[a] + GF_LOG[b]])
 
 
 def gf_pow(a: int, n: int) -> int:
-    """GF(2⁸)'de üs alma"""
-    result = 1
-    while n > 0:
-        if n & 1:
-            result = gf_mul(result, a)
-        a = gf_mul(a, a)
-        n >>= 1
-    return result
+    """
+    GF(2⁸)'de üs alma: a^n = g^(n · log a)
+    
+    Kare-çarp döngüsü yok: maliyet n'den bağımsız (tek çarpma + tablo okuma).
+    """
+    if n == 0:
+        return 1
+    if a == 0:
+        return 0
+    return int(GF_EXP[(GF_LOG[a] * n) % 255])
 
 
 def gf_inv(a: int) -> int:
     """
     GF(2⁸)'de çarpımsal ters
-    a^(-1) = a^(254) (Fermat küçük teoremi)
+    a^(-1) = g^((255 - log a) mod 255)
     """
     if a == 0:
         return 0
-    return gf_pow(a, 254)
+    return int(GF_EXP[(255 - GF_LOG[a]) % 255])
 
 
 # Önceden hesaplanmış çarpma tabloları (performans için)
-def _build_mul_table(c: int) -> list:
-    """c ile çarpma tablosu"""
-    return [gf_mul(i, c) for i in range(256)]
+def _build_mul_table(c: int) -> np.ndarray:
+    """c ile çarpma tablosu (log tablosu üzerinden tek vektörel ifade)"""
+    if c == 0:
+        return np.zeros(256, dtype=np.uint8)
+    table = GF_EXP[(GF_LOG + GF_LOG[c]) % 255]
+    table[0] = 0
+    return table.astype(np.uint8)
 
 
 # AES MixColumns için kullanılan sabitler
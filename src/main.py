@@ -5,13 +5,103 @@ Ana sınıf: Topolojiden S-box ve RNG.
 """
 
 import hashlib
+import hmac
+import os
+import zipfile
 import numpy as np
 from typing import List, Optional
 
 from .topology import build_graph, extract_features, features_to_topo_bytes
 from .permutation import get_permutations
 from .sbox import get_sbox_pair, AES_SBOX
-from .spn import generate_round_keys, generate_random_block, encrypt_block, STATE_SIZE
+from .spn import (generate_round_keys, generate_random_block, encrypt_block, encrypt_blocks,
+                  encrypt_blocks_bitsliced, counter_blocks, bit_permutation_index, diffusion_index, round_tables,
+                  STATE_SIZE)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# KURULUM ÖNBELLEĞİ
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Aynı (seed, mod) için kurulum çıktıları deterministik; tekrar hesaplamak yerine
+# diskten okunabilir. Önbellek isteğe bağlıdır (GraphCrypto(cache_dir=...)).
+# Round key'ler asla diske yazılmaz; her seferinde seed'den türetilir.
+# Format değişirse sürüm artırılır (eski dosyalar yok sayılır).
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "graph_crypto")
+_CACHE_VERSION = 2
+_CACHE_FIELDS = ("topo_bytes", "laplacian", "pi", "pi_inv", "sbox", "sbox_inv")
+_SALT_FILE = ".salt"
+
+
+def _write_private(path: str, data: bytes) -> None:
+    """Dosyayı sadece sahibi okuyabilecek şekilde (0600) yeni oluşturarak yaz."""
+    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+
+
+def _cache_salt(cache_dir: str) -> bytes:
+    """
+    Dizine özel gizli tuz (0600 dosyada). Dosya adları bununla anahtarlanır;
+    dizini listeleyebilen biri düşük entropili seed'leri çevrimdışı deneyemez.
+
+    Dizin yoksa 0700 oluşturulur. Var olan dizinin izinlerine dokunulmaz:
+    başkasına aitse veya grup/diğerleri erişebiliyorsa (0700 değilse)
+    reddedilir (OSError) ve içine hiçbir şey yazılmaz.
+    """
+    try:
+        os.makedirs(cache_dir, mode=0o700)
+        os.chmod(cache_dir, 0o700)  # umask'tan bağımsız; dizini biz oluşturduk
+    except FileExistsError:
+        st = os.stat(cache_dir)
+        if st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise OSError(f"Önbellek dizini 0700 değil veya başkasına ait: {cache_dir}")
+    path = os.path.join(cache_dir, _SALT_FILE)
+    try:
+        _write_private(path, os.urandom(32))
+    except FileExistsError:
+        pass
+    with open(path, "rb") as f:
+        salt = f.read()
+    if len(salt) != 32:
+        raise OSError("Önbellek tuzu bozuk")
+    return salt
+
+
+def _cache_path(cache_dir: str, seed: str, sbox_mode: str, betweenness_k: Optional[int]) -> str:
+    """(seed, mod, betweenness_k) için önbellek dosyası yolu (tuzlu HMAC adı)."""
+    key = f"v{_CACHE_VERSION}|{seed}|{sbox_mode}|{betweenness_k}"
+    name = hmac.new(_cache_salt(cache_dir), key.encode(), hashlib.sha256).hexdigest()
+    return os.path.join(cache_dir, name + ".npz")
+
+
+def _load_cache(path: str) -> Optional[dict]:
+    """Önbelleği oku; yoksa veya bozuksa None."""
+    try:
+        with np.load(path) as data:
+            return {name: data[name] for name in _CACHE_FIELDS}
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+
+def _save_cache(path: str, artifacts: dict) -> None:
+    """Önbelleği yaz (0600 geçici dosya + os.replace). Yazılamazsa sessizce geçer."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **artifacts)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+# Şifreleme ara dizileri blok sayısıyla büyür (bit açma ×8, T-tablo turu ×16);
+# büyük istekler bu boyutta parçalara bölünüp önceden ayrılmış çıktıya yazılır.
+_BATCH_BLOCKS = 4096
 
 
 class GraphCrypto:
@@ -27,15 +117,39 @@ class GraphCrypto:
         - "PURE": Orijinal AES S-box (en güvenli)
         - "AFFINE": Affine dönüşüm (DU/NL korunur, özgün)
         - "CONJUGATE": Permütasyon (özgün ama DU düşer)
+    
+    Not: "PURE" modda da şifre standart AES-128 değildir (12 round,
+    hash zincirinden bağımsız round key'ler, graf tabanlı bit P-Layer).
+    Bu yüzden AES-NI gibi donanım AES yollarına devredilemez; toplu
+    üretim için generate_blocks kullanın.
     """
     
-    def __init__(self, seed: str, sbox_mode: str = "AFFINE"):
+    def __init__(self, seed: str, sbox_mode: str = "AFFINE", betweenness_k: Optional[int] = None,
+                 rebuild: bool = False, constant_time: bool = False,
+                 cache_dir: Optional[str] = None):
         """
         Args:
             seed: Herhangi bir string (kullanıcı girdisi)
             sbox_mode: "PURE", "AFFINE", veya "CONJUGATE"
+            betweenness_k: Verilirse betweenness k node örneklenerek yaklaşık
+                hesaplanır (daha hızlı kurulum, ama farklı S-box/çıktı).
+                None = tam hesap (varsayılan, önceki sürümlerle uyumlu).
+            rebuild: True ise disk önbelleği okunmaz; her şey yeniden
+                hesaplanıp önbellek güncellenir (cache_dir verildiyse).
+            constant_time: True ise şifreleme gizli byte ile adreslenen tablo
+                okumaları olmadan (bitsliced SubBytes, xtime MixColumns) yapılır.
+                Sadece "PURE" modda; çıktı aynı, ama toplu üretimde ~3x,
+                tek blokta çok daha yavaş.
+            cache_dir: Verilirse topoloji/π/S-box bu dizinde önbelleklenir
+                (örn. DEFAULT_CACHE_DIR). Dizin yoksa 0700 oluşturulur; var olan
+                dizin 0700 değilse izinlerine dokunulmaz, önbellek kapanır.
+                Dosyalar 0600; round key'ler yazılmaz. None = önbellek yok (varsayılan).
         """
+        if constant_time and sbox_mode != "PURE":
+            raise ValueError("constant_time sadece 'PURE' S-box modunda destekleniyor")
+        
         self.seed = seed
+        self.constant_time = constant_time
         self.sbox_mode = sbox_mode
         self._counter = 0
         
@@ -44,9 +158,52 @@ class GraphCrypto:
         self.graph = build_graph(seed)
         print(f"      Nodes: {self.graph.number_of_nodes()}, Edges: {self.graph.number_of_edges()}")
         
+        cache_path = None
+        if cache_dir is not None:
+            try:
+                cache_path = _cache_path(cache_dir, seed, sbox_mode, betweenness_k)
+            except OSError as e:
+                print(f"      Uyarı: önbellek kullanılmıyor ({e})")
+                cache_path = None
+        cached = None if (rebuild or cache_path is None) else _load_cache(cache_path)
+        
+        if cached is not None:
+            # 2-4. Önbellekten (topoloji, π, S-box)
+            print(f"[2-4/5] Önbellekten yükleniyor...")
+            for name in _CACHE_FIELDS:
+                setattr(self, name, cached[name])
+        else:
+            self._build_artifacts(seed, sbox_mode, betweenness_k)
+            if cache_path is not None:
+                _save_cache(cache_path, {name: getattr(self, name) for name in _CACHE_FIELDS})
+        
+        # 5. Round keys (önbelleğe yazılmaz; her zaman seed'den türetilir)
+        print(f"[5/5] Round key'ler üretiliyor...")
+        seed_hash = hashlib.sha256(seed.encode() + bytes(self.topo_bytes[:32])).digest()
+        self.round_keys = generate_round_keys(seed_hash)
+        
+        # 16x16 matris görünümleri (kopya yok; aynı tampon)
+        self.topo_bytes = np.ascontiguousarray(self.topo_bytes, dtype=np.uint8)
+        self.sbox = np.ascontiguousarray(self.sbox, dtype=np.uint8)
+        self.topo_matrix = self.topo_bytes.reshape((16, 16))
+        self.sbox_matrix = self.sbox.reshape((16, 16))
+        
+        self._bitperm_idx = bit_permutation_index(self.pi)
+        self._diffusion_idx = diffusion_index(self._bitperm_idx)
+        
+        # Round T-tabloları (SubBytes + P-Layer + MixColumns tek okumada)
+        self._round_tables = round_tables(self.sbox, self._diffusion_idx)
+        
+        print(f"[OK] Sistem hazır!")
+    
+    def _build_artifacts(self, seed: str, sbox_mode: str, betweenness_k: Optional[int]) -> None:
+        """Kurulum adımları 2-4: topoloji → π → S-box."""
         # 2. Topolojik özellikler
         print(f"[2/5] Topolojik özellikler çıkarılıyor (Laplacian dahil)...")
-        degree, clustering, betweenness, laplacian = extract_features(self.graph)
+        # Örnekleme tohumu seed'den türetilir (hash() süreçler arası sabit değil)
+        sample_seed = int.from_bytes(hashlib.sha256(seed.encode()).digest()[:4], 'big')
+        degree, clustering, betweenness, laplacian = extract_features(
+            self.graph, betweenness_k=betweenness_k, sample_seed=sample_seed)
         self.topo_bytes = features_to_topo_bytes(degree, clustering, betweenness, laplacian)
         self.laplacian = laplacian  # İNOVASYON için saklıyoruz
         
@@ -65,15 +222,22 @@ class GraphCrypto:
 
         
         # S-box AES'ten ne kadar farklı?
-        diff_count = sum(1 for i in range(256) if self.sbox[i] != AES_SBOX[i])
+        diff_count = int(np.count_nonzero(self.sbox != AES_SBOX))
         print(f"      AES'ten farklı: {diff_count}/256 byte")
-        
-        # 5. Round keys
-        print(f"[5/5] Round key'ler üretiliyor...")
-        seed_hash = hashlib.sha256(seed.encode() + bytes(self.topo_bytes[:32])).digest()
-        self.round_keys = generate_round_keys(seed_hash)
-        
-        print(f"[OK] Sistem hazır!")
+    
+    def _encrypt_batch(self, states: np.ndarray) -> np.ndarray:
+        """(N, 16) blokları bu örneğin anahtarlarıyla tek seferde şifrele."""
+        if self.constant_time:
+            return encrypt_blocks_bitsliced(states, self.round_keys, self._diffusion_idx)
+        return encrypt_blocks(states, self.sbox, self.round_keys, self._diffusion_idx, self._round_tables)
+    
+    def _encrypt_blocks(self, states: np.ndarray) -> np.ndarray:
+        """(N, 16) blokları _BATCH_BLOCKS'luk parçalarla şifrele (sınırlı bellek)."""
+        out = np.empty((len(states), STATE_SIZE), dtype=np.uint8)
+        for start in range(0, len(states), _BATCH_BLOCKS):
+            stop = start + _BATCH_BLOCKS
+            out[start:stop] = self._encrypt_batch(states[start:stop])
+        return out
     
     def generate_block(self) -> bytes:
         """
@@ -81,20 +245,38 @@ class GraphCrypto:
         
         Her çağrıda farklı blok (counter artar).
         """
+        if self.constant_time:
+            return bytes(self.generate_blocks(1)[0])
         # counter'ı plaintext olarak kullan
         plaintext = self._counter.to_bytes(STATE_SIZE, byteorder='big')
-        block = encrypt_block(plaintext, self.sbox, self.round_keys, self.pi)
+        block = encrypt_block(plaintext, self.sbox, self.round_keys,
+                              diffusion_idx=self._diffusion_idx, tables=self._round_tables)
         self._counter += 1
         return block
     
+    def generate_blocks(self, num_blocks: int) -> np.ndarray:
+        """
+        num_blocks adet bloğu tek seferde üret (CTR, vektörel).
+        
+        generate_block'u num_blocks kez çağırmakla aynı çıktı.
+        
+        Returns:
+            (num_blocks, 16) uint8 array
+        """
+        blocks = np.empty((num_blocks, STATE_SIZE), dtype=np.uint8)
+        for start in range(0, num_blocks, _BATCH_BLOCKS):
+            count = min(_BATCH_BLOCKS, num_blocks - start)
+            counters = counter_blocks(self._counter + start, count)
+            blocks[start:start + count] = self._encrypt_batch(counters)
+        self._counter += num_blocks
+        return blocks
+    
     def generate_bytes(self, n: int) -> bytes:
         """
         n byte rastgele üret.
         """
-        result = b""
-        while len(result) < n:
-            result += self.generate_block()
-        return result[:n]
+        num_blocks = (n + STATE_SIZE - 1) // STATE_SIZE
+        return self.generate_blocks(num_blocks).reshape(-1)[:n].tobytes()
     
     def encrypt(self, data: bytes) -> bytes:
         """
@@ -106,13 +288,9 @@ class GraphCrypto:
             padding_len = 0
         padded = data + bytes([padding_len] * padding_len) if padding_len > 0 else data
         
-        # Blok blok şifrele
-        result = b""
-        for i in range(0, len(padded), STATE_SIZE):
-            block = padded[i:i+STATE_SIZE]
-            result += encrypt_block(block, self.sbox, self.round_keys, self.pi)
-        
-        return result
+        # Bloklar parçalar halinde şifrelenir (bloklar arası zincirleme yok)
+        blocks = np.frombuffer(padded, dtype=np.uint8).reshape((-1, STATE_SIZE))
+        return self._encrypt_blocks(blocks).tobytes()
     
     def get_sbox(self) -> np.ndarray:
         """S-box'ı döndür."""
@@ -132,7 +310,7 @@ class GraphCrypto:
             "edges": self.graph.number_of_edges(),
             "density": nx.density(self.graph),
             "avg_clustering": nx.average_clustering(self.graph),
-            "sbox_diff_from_aes": sum(1 for i in range(256) if self.sbox[i] != AES_SBOX[i]),
+            "sbox_diff_from_aes": int(np.count_nonzero(self.sbox != AES_SBOX)),
             "blocks_generated": self._counter
         }
 
@@ -49,9 +49,8 @@ def invert_pi(pi: np.ndarray) -> np.ndarray:
     Returns:
         π⁻¹[256]
     """
-    pi_inv = np.zeros(256, dtype=np.uint8)
-    for i in range(256):
-        pi_inv[pi[i]] = i
+    pi_inv = np.empty(256, dtype=np.uint8)
+    pi_inv[pi] = np.arange(256, dtype=np.uint8)
     return pi_inv
 
 
@@ -60,7 +59,7 @@ def verify_permutation(pi: np.ndarray) -> bool:
     Permütasyonun geçerli olduğunu doğrula.
     (Her değer tam bir kez görünmeli)
     """
-    return len(set(pi)) == 256 and all(0 <= x < 256 for x in pi)
+    return np.array_equal(np.sort(pi), np.arange(256))
 
 
 def get_permutations(topo_bytes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
@@ -78,8 +77,7 @@ def get_permutations(topo_bytes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     assert verify_permutation(pi_inv), "π⁻¹ geçersiz permütasyon!"
     
     # π(π⁻¹(x)) = x kontrolü
-    for x in range(256):
-        assert pi[pi_inv[x]] == x, f"Ters permütasyon hatası: x={x}"
+    assert np.array_equal(pi[pi_inv], np.arange(256)), "Ters permütasyon hatası!"
     
     return pi, pi_inv
 
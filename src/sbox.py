@@ -9,7 +9,7 @@ Dört farklı mod:
 """
 
 import numpy as np
-from typing import Tuple
+from typing import Tuple, Union
 import hashlib
 
 # Standart AES S-box (256 byte)
@@ -77,18 +77,30 @@ def generate_sbox_conjugate(pi: np.ndarray, pi_inv: np.ndarray) -> np.ndarray:
 # MOD 2: AFFINE (DU korunur!)
 # ═══════════════════════════════════════════════════════════════════════════
 
+def _build_gf8_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """GF(2^8) log/antilog tabloları (üreteç 0x03, polinom 0x11B)."""
+    exp = np.zeros(512, dtype=np.uint8)
+    log = np.zeros(256, dtype=np.uint16)
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        x2 = (x << 1) & 0xFF
+        if x & 0x80:
+            x2 ^= 0x1B  # x^8 + x^4 + x^3 + x + 1
+        x ^= x2  # x × 3
+    exp[255:510] = exp[:255]
+    return exp, log
+
+
+_GF8_EXP, _GF8_LOG = _build_gf8_tables()
+
+
 def gf8_multiply(a: int, b: int) -> int:
-    """GF(2^8) çarpma"""
-    result = 0
-    for _ in range(8):
-        if b & 1:
-            result ^= a
-        hi_bit = a & 0x80
-        a = (a << 1) & 0xFF
-        if hi_bit:
-            a ^= 0x1B  # x^8 + x^4 + x^3 + x + 1
-        b >>= 1
-    return result
+    """GF(2^8) çarpma (log/antilog tablosu ile)"""
+    if a == 0 or b == 0:
+        return 0
+    return int(_GF8_EXP[int(_GF8_LOG[a]) + int(_GF8_LOG[b])])
 
 
 def generate_affine_matrix(topo_bytes: np.ndarray, laplacian: np.ndarray = None) -> Tuple[np.ndarray, int]:
@@ -141,12 +153,21 @@ def generate_affine_matrix(topo_bytes: np.ndarray, laplacian: np.ndarray = None)
 
 
 
-def apply_affine(x: int, matrix: np.ndarray, b: int) -> int:
-    """Affine dönüşüm uygula: y = Ax ⊕ b"""
-    x_bits = np.array([(x >> i) & 1 for i in range(8)], dtype=np.uint8)
-    y_bits = np.dot(matrix, x_bits) % 2
-    y = sum(int(y_bits[i]) << i for i in range(8))
-    return y ^ b
+def apply_affine(x: Union[int, np.ndarray], matrix: np.ndarray, b: int) -> Union[int, np.ndarray]:
+    """
+    Affine dönüşüm uygula: y = Ax ⊕ b
+    
+    x: int veya uint8 array (tüm elemanlara tek matris çarpımıyla uygulanır).
+    int verilirse int, array verilirse aynı şekilde uint8 array döner.
+    """
+    x = np.asarray(x, dtype=np.uint8)
+    flat = np.atleast_1d(x).ravel()
+    x_bits = np.unpackbits(flat[:, None], axis=1, bitorder='little').astype(np.int64)
+    y_bits = (x_bits @ matrix.T.astype(np.int64)) % 2
+    y = np.packbits(y_bits.astype(np.uint8), axis=1, bitorder='little').ravel() ^ np.uint8(b)
+    if x.ndim == 0:
+        return int(y[0])
+    return y.reshape(x.shape)
 
 
 def generate_sbox_affine(topo_bytes: np.ndarray, laplacian: np.ndarray = None) -> np.ndarray:
@@ -161,12 +182,8 @@ def generate_sbox_affine(topo_bytes: np.ndarray, laplacian: np.ndarray = None) -
     """
     matrix, b = generate_affine_matrix(topo_bytes, laplacian)
     
-    sbox_new = np.zeros(256, dtype=np.uint8)
-    for x in range(256):
-        aes_out = AES_SBOX[x]
-        sbox_new[x] = apply_affine(aes_out, matrix, b)
-    
-    return sbox_new
+    # S'[x] = A·S_AES[x] ⊕ b — 256 girişin hepsi tek seferde
+    return apply_affine(AES_SBOX, matrix, b)
 
 
 
@@ -234,15 +251,14 @@ def generate_sbox(pi: np.ndarray, pi_inv: np.ndarray,
 
 def generate_sbox_inv(sbox: np.ndarray) -> np.ndarray:
     """S-box tersini hesapla."""
-    sbox_inv = np.zeros(256, dtype=np.uint8)
-    for x in range(256):
-        sbox_inv[sbox[x]] = x
+    sbox_inv = np.empty(256, dtype=np.uint8)
+    sbox_inv[sbox] = np.arange(256, dtype=np.uint8)
     return sbox_inv
 
 
 def verify_sbox(sbox: np.ndarray) -> bool:
     """S-box'ın bijective olduğunu doğrula."""
-    return len(set(sbox)) == 256
+    return np.array_equal(np.sort(sbox), np.arange(256))
 
 
 def get_sbox_pair(pi: np.ndarray, pi_inv: np.ndarray,
@@ -259,8 +275,7 @@ def get_sbox_pair(pi: np.ndarray, pi_inv: np.ndarray,
     sbox_inv = generate_sbox_inv(sbox)
     
     # Doğrulama
-    for x in range(256):
-        assert sbox_inv[sbox[x]] == x, f"Ters S-box hatası: x={x}"
+    assert np.array_equal(sbox_inv[sbox], np.arange(256)), "Ters S-box hatası!"
     
     return sbox, sbox_inv
 
@@ -6,7 +6,7 @@ AES benzeri Substitution-Permutation Network.
 
 import numpy as np
 import hashlib
-from typing import List
+from typing import List, Tuple
 from .gf256 import MUL_02, MUL_03, gf_add
 
 
@@ -19,13 +19,46 @@ STATE_SIZE = STATE_ROWS * STATE_COLS
 NUM_ROUNDS = 12
 
 
-def sub_bytes(state: np.ndarray, sbox: np.ndarray) -> np.ndarray:
+def _build_mix_tables() -> np.ndarray:
+    """
+    MixColumns T-tabloları.
+    
+    MIX_T[r, b] = satır r'deki b byte'ının çıkış sütununa katkısı (4 byte).
+    Çıkış sütunu = MIX_T[0, a0] ⊕ MIX_T[1, a1] ⊕ MIX_T[2, a2] ⊕ MIX_T[3, a3]
+    """
+    one = np.arange(256, dtype=np.uint8)
+    two = np.asarray(MUL_02, dtype=np.uint8)
+    three = np.asarray(MUL_03, dtype=np.uint8)
+    # MixColumns matrisinin sütunları (r. giriş satırının katsayıları)
+    coeffs = [
+        (two, one, one, three),
+        (three, two, one, one),
+        (one, three, two, one),
+        (one, one, three, two),
+    ]
+    return np.stack([np.stack(col, axis=1) for col in coeffs])
+
+
+MIX_T = _build_mix_tables()
+_ROWS = np.arange(STATE_ROWS)
+
+# ShiftRows byte indeksleri (column-major: byte 4c + r = satır r, sütun c)
+# Çıkış (r, c) ← giriş (r, c + r mod 4)
+SHIFT_IDX = np.array([4 * ((c + r) % STATE_COLS) + r
+                      for c in range(STATE_COLS) for r in range(STATE_ROWS)], dtype=np.intp)
+SHIFT_IDX_INV = np.argsort(SHIFT_IDX).astype(np.intp)
+
+
+def sub_bytes(state: np.ndarray, sbox: np.ndarray, out: np.ndarray = None) -> np.ndarray:
     """
     SubBytes: Her byte'ı S-box'tan geçir.
     
     AES ile aynı mantık, farklı S-box.
+    out verilirse sonuç oraya yazılır (out=state ile yerinde).
+    uint8 indeksler her zaman 0-255 aralığında: mode='clip' sınır
+    kontrolünü ve out tamponlamasını atlar.
     """
-    return np.array([sbox[b] for b in state], dtype=np.uint8)
+    return np.take(sbox, state, out=out, mode='clip')
 
 
 def shift_rows(state: np.ndarray) -> np.ndarray:
@@ -37,28 +70,17 @@ def shift_rows(state: np.ndarray) -> np.ndarray:
     - Row 1: 1 byte sola
     - Row 2: 2 byte sola
     - Row 3: 3 byte sola
-    """
-    # State'i 4x4'e çevir (column-major, AES gibi)
-    matrix = state.reshape((STATE_COLS, STATE_ROWS)).T
     
-    # Satırları kaydır
-    for row in range(STATE_ROWS):
-        matrix[row] = np.roll(matrix[row], -row)
-    
-    # Düzleştir
-    return matrix.T.flatten()
+    Sabit bir byte permütasyonu olduğundan tek indeksleme ile uygulanır.
+    """
+    return state[..., SHIFT_IDX]
 
 
 def shift_rows_inv(state: np.ndarray) -> np.ndarray:
     """
     ShiftRows tersi: Satırları sağa kaydır.
     """
-    matrix = state.reshape((STATE_COLS, STATE_ROWS)).T
-    
-    for row in range(STATE_ROWS):
-        matrix[row] = np.roll(matrix[row], row)
-    
-    return matrix.T.flatten()
+    return state[..., SHIFT_IDX_INV]
 
 
 def mix_columns(state: np.ndarray) -> np.ndarray:
@@ -71,45 +93,64 @@ def mix_columns(state: np.ndarray) -> np.ndarray:
     [01 01 02 03]
     [03 01 01 02]
     """
-    # State'i 4x4'e çevir
-    matrix = state.reshape((STATE_COLS, STATE_ROWS)).T.copy()
-    result = np.zeros_like(matrix)
+    # State'i sütunlara ayır: columns[..., c, r] (column-major, AES gibi)
+    # Öndeki eksenler blok yığını (batch) olabilir
+    columns = state.reshape(state.shape[:-1] + (STATE_COLS, STATE_ROWS))
     
-    for col in range(STATE_COLS):
-        a = matrix[:, col]
-        
-        # MixColumns hesabı
-        result[0, col] = MUL_02[a[0]] ^ MUL_03[a[1]] ^ a[2] ^ a[3]
-        result[1, col] = a[0] ^ MUL_02[a[1]] ^ MUL_03[a[2]] ^ a[3]
-        result[2, col] = a[0] ^ a[1] ^ MUL_02[a[2]] ^ MUL_03[a[3]]
-        result[3, col] = MUL_03[a[0]] ^ a[1] ^ a[2] ^ MUL_02[a[3]]
+    # Her sütun için 4 T-tablosu okuması + XOR (tüm sütunlar birlikte)
+    result = np.bitwise_xor.reduce(MIX_T[_ROWS, columns], axis=-2)
     
-    return result.T.flatten()
+    return result.reshape(state.shape)
 
 
-def add_round_key(state: np.ndarray, round_key: np.ndarray) -> np.ndarray:
+def add_round_key(state: np.ndarray, round_key: np.ndarray, out: np.ndarray = None) -> np.ndarray:
     """
     AddRoundKey: State ile round key'i XOR'la.
+    
+    out verilirse sonuç oraya yazılır (out=state ile yerinde).
     """
-    return state ^ round_key
+    return np.bitwise_xor(state, round_key, out=out)
 
 
-def generate_round_keys(seed_hash: bytes, num_rounds: int = NUM_ROUNDS) -> List[np.ndarray]:
+def generate_round_keys(seed_hash: bytes, num_rounds: int = NUM_ROUNDS) -> np.ndarray:
     """
     Round key'leri oluştur.
     
     Her round için 16 byte key, hash zincirinden türetilir.
+    
+    Returns:
+        (num_rounds + 1, 16) uint8 array; keys[r] r. round key'idir.
     """
-    keys = []
+    key_material = bytearray()
     current = seed_hash
     
     for r in range(num_rounds + 1):  # +1 for initial key
         # HKDF benzeri: hash zinciri
         h = hashlib.sha256(current + f"RK{r}".encode()).digest()
-        keys.append(np.frombuffer(h[:STATE_SIZE], dtype=np.uint8).copy())
+        key_material += h[:STATE_SIZE]
         current = h
     
-    return keys
+    return np.frombuffer(bytes(key_material), dtype=np.uint8).reshape((num_rounds + 1, STATE_SIZE)).copy()
+
+
+def bit_permutation_index(pi: np.ndarray) -> np.ndarray:
+    """
+    Dynamic P-Layer için 128-bit indeks tablosu.
+    
+    pi değerlerine dayanarak 128 bit için benzersiz bir sıra oluşturur:
+    (değer, orijinal_index) -> değere göre sırala -> gerçek permütasyon.
+    pi sabit olduğundan bir kez hesaplanıp saklanabilir.
+    """
+    return np.argsort(pi[:128], kind='stable').astype(np.intp)
+
+
+def bit_permutation_fast(state: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """
+    Önceden hesaplanmış indeks tablosu ile bit permütasyonu.
+    
+    state (16,) veya (N, 16) olabilir; son eksen boyunca uygulanır.
+    """
+    return np.packbits(np.unpackbits(state, axis=-1)[..., idx], axis=-1)
 
 
 def bit_permutation(state: np.ndarray, pi: np.ndarray) -> np.ndarray:
@@ -118,22 +159,116 @@ def bit_permutation(state: np.ndarray, pi: np.ndarray) -> np.ndarray:
     
     Graf pi vektörünü (0-127 kısmını) kullanarak bitlerin yerini 
     herhangi bir çakışma olmadan değiştirir.
+    
+    Not: Her çağrıda indeksi yeniden hesaplar; sıcak yolda
+    bit_permutation_index + bit_permutation_fast kullanın.
+    """
+    return bit_permutation_fast(state, bit_permutation_index(pi))
+
+
+def diffusion_index(bitperm_idx: np.ndarray) -> np.ndarray:
+    """
+    ShiftRows + Dynamic P-Layer birleşimi için 128-bit indeks tablosu.
+    
+    İkisi de sabit bit permütasyonu olduğundan bileşkeleri de öyledir:
+    ShiftRows sonrası byte j'nin k. biti = giriş byte'ı SHIFT[j]'nin k. biti.
+    Böylece iki adım tek bir unpack → gather → pack işlemine iner.
+    """
+    return SHIFT_IDX[bitperm_idx // 8] * 8 + bitperm_idx % 8
+
+
+# Sadece ShiftRows (P-Layer yok) — aynı bit-gather yolunda kullanılır
+SHIFT_ROWS_BITS = diffusion_index(np.arange(128, dtype=np.intp))
+
+# Not: Proje derleme adımı olmadan (saf Python + NumPy) dağıtılıyor; bu yüzden
+# C/SIMD eklentisi yerine round'un tamamı aşağıdaki T-tablolarına katlanır.
+_POSITIONS = np.arange(STATE_SIZE)
+
+
+def round_tables(sbox: np.ndarray, diffusion_idx: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
     """
-    # 128-bitlik bir dizi oluştur
-    bits = np.unpackbits(state)
+    Tüm round'u tablo okumalarına indirgeyen T-tabloları.
     
-    # pi değerlerine dayanarak 128 bit için benzersiz bir sıra oluştur
-    # (değer, orijinal_index) -> değere göre sırala -> gerçek permütasyon
-    indexed = [(pi[i], i) for i in range(128)]
-    sorted_indices = [item[1] for item in sorted(indexed, key=lambda x: x[0])]
+    ShiftRows, P-Layer ve MixColumns XOR üzerinde lineerdir; bu yüzden
+    round(state) = ⊕_i T[i, state[i]] yazılabilir. T[i, b], sadece i.
+    pozisyonda S(b) olan (diğerleri sıfır) bir state'in lineer katmandan
+    geçmiş halidir. MixColumns'un GF(2⁸) matris çarpımı da tabloya gömülü
+    olduğundan round içinde ayrı bir çarpma adımı kalmaz.
     
-    # Bitleri yeni sıraya göre yerleştir
-    p_bits = bits[sorted_indices]
+    Returns:
+        (full, final) — her biri (16, 256, 16) uint8.
+        full: SubBytes → ShiftRows/P-Layer → MixColumns (ana round'lar)
+        final: SubBytes → ShiftRows/P-Layer (son round)
+    """
+    if diffusion_idx is None:
+        diffusion_idx = SHIFT_ROWS_BITS
+    
+    single = np.zeros((STATE_SIZE, 256, STATE_SIZE), dtype=np.uint8)
+    single[_POSITIONS[:, None], np.arange(256)[None, :], _POSITIONS[:, None]] = sbox[None, :]
+    
+    final = bit_permutation_fast(single, diffusion_idx)
+    full = mix_columns(final)
+    return full, final
+
+
+def _table_round(states: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """Bir round'un doğrusal olmayan + lineer kısmı: 16 tablo okuması ve XOR."""
+    return np.bitwise_xor.reduce(table[_POSITIONS, states], axis=-2)
+
+
+def encrypt_blocks(states: np.ndarray, sbox: np.ndarray, round_keys: List[np.ndarray],
+                   diffusion_idx: np.ndarray = None,
+                   tables: Tuple[np.ndarray, np.ndarray] = None) -> np.ndarray:
+    """
+    N bloğu birlikte şifrele (CTR modunda toplu üretim için).
+    
+    Her SPN adımı (N, 16) dizinin tamamına tek NumPy çağrısıyla uygulanır.
+    
+    Args:
+        states: (N, 16) uint8 düz metin blokları
+        sbox: 256 byte S-box
+        round_keys: Round key listesi
+        diffusion_idx: Opsiyonel ShiftRows + P-Layer indeksi (diffusion_index).
+            Verilmezse sadece ShiftRows uygulanır.
+        tables: Opsiyonel, aynı sbox/diffusion_idx için round_tables çıktısı.
+            Verilirse her round tek tablo okuması + XOR olarak yürür.
         
-    return np.packbits(p_bits)
+    Returns:
+        (N, 16) uint8 şifrelenmiş bloklar
+    """
+    if diffusion_idx is None:
+        diffusion_idx = SHIFT_ROWS_BITS
+    
+    # İlk AddRoundKey (girişin kopyası; sonrası yerinde)
+    states = add_round_key(states, round_keys[0])
+    
+    if tables is not None:
+        full, final = tables
+        for r in range(1, NUM_ROUNDS):
+            states = _table_round(states, full)
+            add_round_key(states, round_keys[r], out=states)
+        states = _table_round(states, final)
+        add_round_key(states, round_keys[NUM_ROUNDS], out=states)
+        return states
+    
+    # Ana round'lar (son hariç)
+    for r in range(1, NUM_ROUNDS):
+        sub_bytes(states, sbox, out=states)
+        states = bit_permutation_fast(states, diffusion_idx)  # ShiftRows (+ P-Layer)
+        states = mix_columns(states)
+        add_round_key(states, round_keys[r], out=states)
+    
+    # Son round (MixColumns yok)
+    sub_bytes(states, sbox, out=states)
+    states = bit_permutation_fast(states, diffusion_idx)
+    add_round_key(states, round_keys[NUM_ROUNDS], out=states)
+    
+    return states
 
 
-def encrypt_block(plaintext: bytes, sbox: np.ndarray, round_keys: List[np.ndarray], pi: np.ndarray = None) -> bytes:
+def encrypt_block(plaintext: bytes, sbox: np.ndarray, round_keys: List[np.ndarray], pi: np.ndarray = None,
+                  bitperm_idx: np.ndarray = None, diffusion_idx: np.ndarray = None,
+                  tables: Tuple[np.ndarray, np.ndarray] = None) -> bytes:
     """
     Tek bir 16-byte bloğu şifrele.
     
@@ -142,39 +277,171 @@ def encrypt_block(plaintext: bytes, sbox: np.ndarray, round_keys: List[np.ndarra
         sbox: 256 byte S-box
         round_keys: Round key listesi
         pi: Opsiyonel Dynamic P-Layer permütasyonu
+        bitperm_idx: Opsiyonel, pi'den önceden hesaplanmış bit indeksi
+            (bit_permutation_index). Verilirse pi'ye göre önceliklidir.
+        diffusion_idx: Opsiyonel, ShiftRows ile birleştirilmiş bit indeksi
+            (diffusion_index). Verilirse diğerlerine göre önceliklidir.
+        tables: Opsiyonel, önceden hesaplanmış round_tables çıktısı.
         
     Returns:
         16 byte şifrelenmiş
     """
     assert len(plaintext) == STATE_SIZE, f"Plaintext {STATE_SIZE} byte olmalı"
     
-    state = np.frombuffer(plaintext, dtype=np.uint8).copy()
+    if diffusion_idx is None:
+        if bitperm_idx is None and pi is not None:
+            bitperm_idx = bit_permutation_index(pi)
+        if bitperm_idx is not None:
+            diffusion_idx = diffusion_index(bitperm_idx)
     
-    # İlk AddRoundKey
-    state = add_round_key(state, round_keys[0])
+    state = np.frombuffer(plaintext, dtype=np.uint8).reshape((1, STATE_SIZE))
+    
+    return bytes(encrypt_blocks(state, sbox, round_keys, diffusion_idx, tables)[0])
+
+
+# Tablosuz (bitsliced) yol — sadece PURE mod
+# S-box ve MixColumns tablo okumaları gizli byte ile adreslenir (önbellek
+# zamanlama sızıntısı). Bu yolda hiçbir adım gizli veriye bağlı indeks
+# kullanmaz: SubBytes bit düzlemlerinde AND/XOR devresi, MixColumns xtime.
+# np.unpackbits/np.packbits de kullanılmaz (C döngüsü girdi byte'ıyla
+# adreslenen 256'lık tablo okur); bitler kaydırma/maske ile ayrılıp toplanır.
+
+_MSB_SHIFTS = np.arange(7, -1, -1, dtype=np.uint8)
+
+
+def _unpack_bits(values: np.ndarray) -> np.ndarray:
+    """(..., M) byte → (..., 8M) bit (0/1), MSB önce; np.unpackbits'in tablosuz hali."""
+    bits = (values[..., None] >> _MSB_SHIFTS) & np.uint8(1)
+    return bits.reshape(values.shape[:-1] + (-1,))
+
+
+def _pack_bits(bits: np.ndarray) -> np.ndarray:
+    """_unpack_bits tersi: (..., 8M) bit → (..., M) byte (son eksen 8'in katı)."""
+    groups = bits.reshape(bits.shape[:-1] + (-1, 8))
+    return np.bitwise_or.reduce(groups << _MSB_SHIFTS, axis=-1)
+
+
+def _bit_permutation_ct(state: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """bit_permutation_fast ile aynı sonuç; idx sadece anahtara bağlı."""
+    return _pack_bits(_unpack_bits(state)[..., idx])
+
+
+def _to_planes(values: np.ndarray) -> np.ndarray:
+    """M byte → (8, ⌈M/8⌉) bit düzlemi; düzlem k, her byte'ın k. bitini tutar."""
+    padded = np.zeros(-(-values.size // 8) * 8, dtype=np.uint8)
+    padded[:values.size] = values
+    bits = (padded[None, :] >> np.arange(8, dtype=np.uint8)[:, None]) & np.uint8(1)
+    return _pack_bits(bits)
+
+
+def _from_planes(planes: np.ndarray, count: int) -> np.ndarray:
+    """_to_planes tersi: (8, ⌈M/8⌉) → M byte."""
+    bits = _unpack_bits(planes)[:, :count]
+    return np.bitwise_or.reduce(bits << np.arange(8, dtype=np.uint8)[:, None], axis=0)
+
+
+def _gf_mul_planes(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Bit düzlemlerinde GF(2⁸) çarpımı (mod x⁸+x⁴+x³+x+1)."""
+    prod = [np.zeros_like(a[0]) for _ in range(15)]
+    for i in range(8):
+        for j in range(8):
+            prod[i + j] ^= a[i] & b[j]
+    # x^k = x^(k-4) + x^(k-5) + x^(k-7) + x^(k-8)  (k ≥ 8)
+    for k in range(14, 7, -1):
+        for shift in (4, 5, 7, 8):
+            prod[k - shift] ^= prod[k]
+    return np.stack(prod[:8])
+
+
+def sub_bytes_bitsliced(state: np.ndarray) -> np.ndarray:
+    """
+    AES S-box'ı tablo okumadan hesapla: S(x) = Affine(x²⁵⁴).
+    
+    Tüm byte'lar bit düzlemlerine ayrılır ve ters alma x²⁵⁴ zinciri
+    (7 kare + 4 çarpım) ile yapılır; 0²⁵⁴ = 0 AES tanımıyla uyumlu.
+    Sonuç AES_SBOX[state] ile aynıdır.
+    """
+    flat = np.ascontiguousarray(state, dtype=np.uint8).ravel()
+    x = _to_planes(flat)
+    
+    x2 = _gf_mul_planes(x, x)
+    x3 = _gf_mul_planes(x2, x)
+    x6 = _gf_mul_planes(x3, x3)
+    x12 = _gf_mul_planes(x6, x6)
+    x15 = _gf_mul_planes(x12, x3)
+    x240 = x15
+    for _ in range(4):
+        x240 = _gf_mul_planes(x240, x240)
+    inv = _gf_mul_planes(_gf_mul_planes(x240, x12), x2)
+    
+    # Affine: y_i = x_i ⊕ x_(i+4) ⊕ x_(i+5) ⊕ x_(i+6) ⊕ x_(i+7) ⊕ c_i, c = 0x63
+    out = np.stack([inv[i] ^ inv[(i + 4) % 8] ^ inv[(i + 5) % 8]
+                    ^ inv[(i + 6) % 8] ^ inv[(i + 7) % 8] for i in range(8)])
+    for i in range(8):
+        if (0x63 >> i) & 1:
+            out[i] ^= 0xFF
+    
+    return _from_planes(out, flat.size).reshape(state.shape)
+
+
+def _xtime(a: np.ndarray) -> np.ndarray:
+    """GF(2⁸)'de 02 ile çarpım (tablosuz)."""
+    return (a << 1) ^ ((a >> 7) * np.uint8(0x1B))
+
+
+def mix_columns_xtime(state: np.ndarray) -> np.ndarray:
+    """
+    MixColumns, MIX_T yerine xtime ile (gizli indeksli tablo okuması yok).
+    
+    out_r = a_r ⊕ t ⊕ xtime(a_r ⊕ a_(r+1)),  t = a0 ⊕ a1 ⊕ a2 ⊕ a3
+    """
+    columns = state.reshape(state.shape[:-1] + (STATE_COLS, STATE_ROWS))
+    t = np.bitwise_xor.reduce(columns, axis=-1, keepdims=True)
+    result = columns ^ t ^ _xtime(columns ^ np.roll(columns, -1, axis=-1))
+    return result.reshape(state.shape)
+
+
+def encrypt_blocks_bitsliced(states: np.ndarray, round_keys: List[np.ndarray],
+                             diffusion_idx: np.ndarray = None) -> np.ndarray:
+    """
+    encrypt_blocks'un AES S-box (PURE mod) için tablosuz karşılığı.
+    
+    Çıktı, aynı anahtarlarla encrypt_blocks(states, AES_SBOX, ...) ile aynıdır;
+    bit permütasyonu indeksleri gizli veriye değil sadece anahtara bağlıdır.
+    Python/NumPy seviyesinde sabit zaman garantisi verilemez; amaç gizli
+    byte ile adreslenen tablo okumalarını ortadan kaldırmaktır.
+    """
+    if diffusion_idx is None:
+        diffusion_idx = SHIFT_ROWS_BITS
+    
+    states = add_round_key(states, round_keys[0])
     
-    # Ana round'lar (son hariç)
     for r in range(1, NUM_ROUNDS):
-        state = sub_bytes(state, sbox)
-        state = shift_rows(state)
-        
-        # Dynamic P-Layer (Eğer pi verilmişse)
-        if pi is not None:
-            state = bit_permutation(state, pi)
-            
-        state = mix_columns(state)
-        state = add_round_key(state, round_keys[r])
+        states = sub_bytes_bitsliced(states)
+        states = _bit_permutation_ct(states, diffusion_idx)
+        states = mix_columns_xtime(states)
+        add_round_key(states, round_keys[r], out=states)
     
-    # Son round (MixColumns yok)
-    state = sub_bytes(state, sbox)
-    state = shift_rows(state)
+    states = sub_bytes_bitsliced(states)
+    states = _bit_permutation_ct(states, diffusion_idx)
+    add_round_key(states, round_keys[NUM_ROUNDS], out=states)
     
-    if pi is not None:
-        state = bit_permutation(state, pi)
-        
-    state = add_round_key(state, round_keys[NUM_ROUNDS])
+    return states
+
+
+def counter_blocks(start: int, count: int) -> np.ndarray:
+    """
+    start, start+1, ... sayaçlarını (count, 16) big-endian blok dizisine çevir.
+    """
+    if start + count <= 2**64:
+        # Üst 8 byte sıfır, alt 8 byte big-endian sayaç
+        blocks = np.zeros((count, STATE_SIZE), dtype=np.uint8)
+        counters = np.arange(start, start + count, dtype=np.uint64).astype('>u8')
+        blocks[:, 8:] = counters.view(np.uint8).reshape((count, 8))
+        return blocks
     
-    return bytes(state)
+    data = b"".join(c.to_bytes(STATE_SIZE, byteorder='big') for c in range(start, start + count))
+    return np.frombuffer(data, dtype=np.uint8).reshape((count, STATE_SIZE)).copy()
 
 
 def generate_random_block(sbox: np.ndarray, round_keys: List[np.ndarray], counter: int) -> bytes:
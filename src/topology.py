@@ -7,7 +7,39 @@ Seed'den deterministik graf oluşturma ve topolojik özellik çıkarma.
 import hashlib
 import networkx as nx
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
+
+
+def edge_pairs(seed: str, rounds: int = 48) -> np.ndarray:
+    """
+    Seed'in SHA512 hash zincirinden aday edge çiftleri.
+    
+    Her tur 64 byte → 32 (u, v) çifti. Self-loop'lar atılır; sıra korunur
+    ve tekrarlar bırakılır (add_edges_from zaten yok sayar). Clustering ve
+    betweenness float toplamları komşuluk sırasına bağlı olduğundan, grafı
+    kuran herkes çiftleri bu sırayla eklemelidir.
+    
+    Args:
+        seed: Herhangi bir string (kullanıcı girdisi)
+        rounds: Hash tur sayısı (İzlem-1: 16, İzlem-2: 48)
+        
+    Returns:
+        (M, 2) uint8 dizisi
+    """
+    current_hash = seed.encode('utf-8')
+    digests = []
+    
+    for round_num in range(rounds):
+        # SHA512 → 64 byte
+        h = hashlib.sha512(current_hash + round_num.to_bytes(1, 'big')).digest()
+        digests.append(h)
+        
+        # Sonraki tur için hash güncelle
+        current_hash = h
+    
+    # Her 2 byte bir edge (rounds × 32 aday çift tek dizide)
+    pairs = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape(-1, 2)
+    return pairs[pairs[:, 0] != pairs[:, 1]]  # Self-loop yok
 
 
 def build_graph(seed: str) -> nx.Graph:
@@ -30,50 +62,54 @@ def build_graph(seed: str) -> nx.Graph:
     # 256 node ekle
     G.add_nodes_from(range(256))
     
-    # Hash zinciri ile edge'ler oluştur
-    current_hash = seed.encode('utf-8')
+    # Hash zinciri ile edge'ler (Yoğunluk artırıldı: 16 -> 48 tur)
+    pairs = edge_pairs(seed, rounds=48)
     
-    # Yeterli edge için birden fazla hash tur (Yoğunluk artırıldı: 16 -> 48)
-    for round_num in range(48):
-        # SHA512 → 64 byte
-        h = hashlib.sha512(current_hash + round_num.to_bytes(1, 'big')).digest()
-        
-        # Her 2 byte bir edge
-        for i in range(0, 64, 2):
-            u = h[i]
-            v = h[i + 1]
-            if u != v:  # Self-loop yok
-                G.add_edge(u, v)
-        
-        # Sonraki tur için hash güncelle
-        current_hash = h
+    # Toplu ekleme; sıra korunur, tekrar eden edge'ler yok sayılır
+    G.add_edges_from(pairs.tolist())
     
     return G
 
 
-def extract_features(G: nx.Graph) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+def extract_features(G: nx.Graph,
+                     betweenness_k: Optional[int] = None,
+                     sample_seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """
     Graftan topolojik özellikleri çıkar.
     
+    Args:
+        G: 256 node'lu graf
+        betweenness_k: Verilirse betweenness, k kaynak node örneklenerek
+            yaklaşık hesaplanır (~5-8x hızlı). None = tam hesap (varsayılan).
+            Örnekleme topo_bytes'ı değiştirir: aynı seed için çıktılar
+            tam hesaptan farklı olur.
+        sample_seed: Örnekleme için deterministik tohum (betweenness_k ile).
+    
     Returns:
         (degree, clustering, betweenness, laplacian) - Her biri 256 elemanlı array
     """
     n = 256
     
     # 1. Degree (derece)
-    degree = np.array([G.degree(i) for i in range(n)], dtype=np.float64)
+    degree = np.array([G.degree(i) for i in range(n)], dtype=np.int64)
     
     # 2. Clustering coefficient (kümeleme katsayısı)
     clustering_dict = nx.clustering(G)
     clustering = np.array([clustering_dict.get(i, 0.0) for i in range(n)], dtype=np.float64)
     
     # 3. Betweenness centrality (arasındalık merkeziliği)
-    betweenness_dict = nx.betweenness_centrality(G)
+    if betweenness_k is None:
+        betweenness_dict = nx.betweenness_centrality(G)
+    else:
+        betweenness_dict = nx.betweenness_centrality(G, k=betweenness_k, seed=sample_seed)
     betweenness = np.array([betweenness_dict.get(i, 0.0) for i in range(n)], dtype=np.float64)
     
     # 4. Laplacian Spectrum (Özdeğerler)
     # Grafın cebirsel yapısını (bağlanabilirliğini) temsil eder
-    laplacian = nx.laplacian_spectrum(G)
+    # L = D - A doğrudan yoğun olarak kurulur (simetrik → eigvalsh, artan sıra)
+    adjacency = nx.to_numpy_array(G, nodelist=range(n))
+    laplacian_matrix = np.diag(adjacency.sum(axis=1)) - adjacency
+    laplacian = np.linalg.eigvalsh(laplacian_matrix)
     if len(laplacian) < n:
         laplacian = np.pad(laplacian, (0, n - len(laplacian)), 'constant')
     elif len(laplacian) > n:
@@ -84,18 +120,25 @@ def extract_features(G: nx.Graph) -> Tuple[np.ndarray, np.ndarray, np.ndarray, n
 
 def normalize_to_bytes(arr: np.ndarray) -> np.ndarray:
     """
-    Float array'i 0-255 arası byte'lara normalize et.
+    Array'i 0-255 arası byte'lara normalize et (min-max).
+    
+    Tamsayı girişlerde (örn. degree) hesap tamamen tamsayı aritmetiğiyle
+    yapılır: sonuç platformun float yuvarlamasından bağımsızdır ve
+    float yoluyla aynı byte'ları verir.
     """
     if len(arr) == 0:
         return np.zeros(256, dtype=np.uint8)
         
     arr_min = arr.min()
-    arr_max = arr.max()
+    span = np.ptp(arr)
     
-    if arr_max == arr_min:
+    if span == 0:
         return np.zeros(len(arr), dtype=np.uint8)
     
-    normalized = (arr - arr_min) / (arr_max - arr_min)
+    if np.issubdtype(arr.dtype, np.integer):
+        return ((arr - arr_min).astype(np.int64) * 255 // span).astype(np.uint8)
+    
+    normalized = (arr - arr_min) / span
     return (normalized * 255).astype(np.uint8)
 
 
@@ -2,73 +2,218 @@
 Sistem Görselleştirme Modülü
 ----------------------------
 Graf yapısı, S-box dağılımı ve topolojik özellikleri görselleştirir.
+
+matplotlib ve Pillow sadece çizim fonksiyonlarının içinde yüklenir;
+modülü import etmek onların açılış maliyetini ödemez.
+
+Figürler doğrudan FigureCanvasAgg ile çizilir: matplotlib backend seçimi
+(Qt/Tk/... yoklaması) hiç tetiklenmez ve çağıranın interaktif backend'i
+değiştirilmez. Ekranda göstermek için ayrıca pyplot kullanılmalıdır.
 """
 
 import os
+import hashlib
+import functools
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import matplotlib.pyplot as plt
-import networkx as nx
-import seaborn as sns
+import networkx as nx  # .main (topology) zaten yüklüyor
 from .main import GraphCrypto
+from .layouts import spring_layout_fr, spectral_layout
+
+# Hata ayıklama görselleri: hızlı PNG kodlama, dosya boyutu ikinci planda
+_PNG_KWARGS = {"optimize": False, "compress_level": 1}
 
-def visualize_all(seed: str, output_dir: str):
+# Paketle gelen font sabitlenir: başlık/etiketlerde font yedek zinciri aranmaz.
+# Sadece çizim sırasında (rc_context) geçerli; global rcParams değişmez.
+_RC = {"font.family": "DejaVu Sans", "font.size": 10, "axes.unicode_minus": False}
+
+
+def _save_heatmap(matrix: np.ndarray, cmap, path: str, size: int = 512) -> None:
     """
-    Sistemin tüm aşamalarını görselleştirip belirtilen dizine kaydeder.
+    Küçük matrisi doğrudan renk haritası → PNG olarak kaydet.
+    
+    Axes/colorbar kurulmaz; min-max normalize edilip her hücre tam sayı
+    kat (size // satır) piksel bloğuna büyütülür (en yakın komşu, np.repeat).
+    cmap: Colormap veya adı ("magma").
     """
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    import matplotlib
+    from PIL import Image
+    
+    if isinstance(cmap, str):
+        cmap = matplotlib.colormaps[cmap]
+    matrix = np.asarray(matrix, dtype=np.float64)
+    norm = (matrix - matrix.min()) / (np.ptp(matrix) + 1e-12)
+    rgba = cmap(norm, bytes=True)  # doğrudan uint8 RGBA
+    scale_y, scale_x = size // matrix.shape[0], size // matrix.shape[1]
+    rgba = np.repeat(np.repeat(rgba, scale_y, axis=0), scale_x, axis=1)
+    Image.fromarray(rgba).save(path, **_PNG_KWARGS)
 
-    print(f"Sistem oluşturuluyor (seed: {seed})...")
-    crypto = GraphCrypto(seed)
 
-    # 1. Graf Yapısı Görselleştirme
-    print("Graf yapısı çiziliyor...")
-    plt.figure(figsize=(12, 12))
-    pos = nx.spring_layout(crypto.graph, seed=42, k=0.1)
+def _new_axes(figsize: tuple, margins: dict):
+    """
+    pyplot'suz Figure + Agg canvas + tek Axes.
     
-    # Düğümleri dereceye göre renklendir
-    degrees = [crypto.graph.degree(n) for n in crypto.graph.nodes()]
-    nx.draw_networkx_nodes(crypto.graph, pos, node_size=20, node_color=degrees, cmap=plt.cm.viridis, alpha=0.8)
-    nx.draw_networkx_edges(crypto.graph, pos, alpha=0.1, edge_color='gray')
+    pyplot'un global figür yöneticisi/durumu kullanılmaz; plt.close gerekmez.
+    Kenar boşlukları sabit (subplots_adjust); tight_layout ölçüm geçişi yapılmaz.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    fig.subplots_adjust(**margins)
+    return fig, fig.add_subplot(111)
+
+
+def _render_graph(path: str, pos: np.ndarray, edges: np.ndarray,
+                  degrees: np.ndarray, title: str, dpi: int) -> None:
+    """
+    Graf yapısı: düğümler dereceye göre renkli, kenarlar yarı saydam.
+    
+    pos: (N, 2) float32 konum dizisi, edges: (E, 2) kenar uçları.
+    networkx çizim fonksiyonları kullanılmaz; düğümler tek scatter,
+    kenarlar tek LineCollection.
+    """
+    from matplotlib import rc_context
+    from matplotlib.collections import LineCollection
+    
+    print("Graf yapısı çiziliyor...")
+    with rc_context(_RC):
+        fig, ax = _new_axes((12, 12), dict(left=0.02, right=0.98, top=0.96, bottom=0.02))
+        
+        # Tüm kenarlar tek LineCollection: (E, 2, 2) segment dizisi
+        segments = np.stack([pos[edges[:, 0]], pos[edges[:, 1]]], axis=1)
+        ax.add_collection(LineCollection(segments, colors='gray', alpha=0.1, linewidths=1.0,
+                                         antialiaseds=False))
+        
+        # Renk aralığı açıkça verilir: matplotlib'in otomatik ölçekleme geçişi atlanır
+        ax.scatter(pos[:, 0], pos[:, 1], s=20, c=degrees, cmap="viridis",
+                   vmin=int(degrees.min()), vmax=int(degrees.max()), alpha=0.8, zorder=2)
+        
+        ax.set_title(title)
+        ax.set_axis_off()
+        fig.savefig(path, dpi=dpi, pil_kwargs=_PNG_KWARGS)
+
+
+def _render_pi(path: str, pi: np.ndarray) -> None:
+    """Permütasyon (Pi) dağılımı."""
+    from matplotlib import rc_context
     
-    plt.title(f"Graf Yapısı (Seed: {seed})")
-    plt.axis('off')
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "v_graph.png"), dpi=150)
-    plt.close()
-
-    # 2. Topolojik Özellikler Isı Haritası
-    print("Topolojik özellikler görselleştiriliyor...")
-    plt.figure(figsize=(10, 6))
-    # topo_bytes'ı 16x16 matrise çevir
-    topo_matrix = crypto.topo_bytes.reshape((16, 16))
-    sns.heatmap(topo_matrix, annot=False, cmap="magma", cbar=True)
-    plt.title("Topolojik Byte Matrisi (16x16)")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "v_topo_heat.png"), dpi=100)
-    plt.close()
-
-    # 3. S-box Görselleştirme
-    print("S-box görselleştiriliyor...")
-    plt.figure(figsize=(10, 6))
-    sbox_matrix = crypto.sbox.reshape((16, 16))
-    sns.heatmap(sbox_matrix, annot=False, cmap="coolwarm", cbar=True)
-    plt.title(f"S-box Dağılımı (Mod: {crypto.sbox_mode})")
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "v_sbox_heat.png"), dpi=100)
-    plt.close()
-
-    # 4. Permütasyon (Pi) Dağılımı
     print("Permütasyon görselleştiriliyor...")
-    plt.figure(figsize=(10, 4))
-    plt.plot(crypto.pi, 'b.', markersize=2)
-    plt.title("Pi Permütasyon Dağılımı (0-255)")
-    plt.xlabel("Giriş İndeksi")
-    plt.ylabel("Çıkış İndeksi")
-    plt.grid(True, alpha=0.3)
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "v_pi_plot.png"), dpi=100)
-    plt.close()
+    with rc_context(_RC):
+        fig, ax = _new_axes((10, 4), dict(left=0.08, right=0.98, top=0.9, bottom=0.14))
+        # Tek rasterize scatter: nokta sayısı artsa da tek görüntü olarak çizilir
+        ax.scatter(np.arange(len(pi)), pi, s=2, c='b', rasterized=True)
+        ax.set_title("Pi Permütasyon Dağılımı (0-255)")
+        ax.set_xlabel("Giriş İndeksi")
+        ax.set_ylabel("Çıkış İndeksi")
+        ax.grid(True, alpha=0.3)
+        fig.savefig(path, dpi=100, pil_kwargs=_PNG_KWARGS)
+
+
+def _dispatch(job: tuple) -> None:
+    """(fonksiyon, argümanlar) işini çalıştır (süreç havuzu için üst seviye)."""
+    func, args = job
+    func(*args)
+
+
+def _cached_spring_layout(edges: np.ndarray, n: int, output_dir: str) -> np.ndarray:
+    """
+    Yay yerleşimi, output_dir içinde kenar listesi + parametrelerle anahtarlanmış
+    .npy dosyasında saklanır; aynı graf tekrar çizilirken yeniden hesaplanmaz.
+    Bozuk/yarım ya da boyutu uymayan dosya yok sayılıp yeniden hesaplanır.
+    """
+    key = hashlib.blake2b(edges.astype(np.int64).tobytes() + f"|{n}|k=0.1|seed=42".encode(),
+                          digest_size=8).hexdigest()
+    path = os.path.join(output_dir, f".pos_{key}.npy")
+    try:
+        pos = np.load(path)
+        if pos.shape == (n, 2):
+            return pos
+    except (OSError, ValueError, EOFError):
+        pass
+
+    pos = spring_layout_fr(edges[:, 0], edges[:, 1], n, k=0.1, seed=42)
+    # Geçici dosya + os.replace: yarım yazılmış dosya asla okunmaz
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.save(f, pos)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return pos
+
+
+@functools.lru_cache(maxsize=8)
+def _build_crypto(seed: str) -> GraphCrypto:
+    """Aynı seed için sistemi bir kez kur; tekrar çağrılarda aynı nesne döner."""
+    print(f"Sistem oluşturuluyor (seed: {seed})...")
+    return GraphCrypto(seed)
+
+
+def visualize_all(seed: str, output_dir: str, crypto: GraphCrypto = None, layout: str = "spectral",
+                  graph_dpi: int = 100, workers: int = None):
+    """
+    Sistemin tüm aşamalarını görselleştirip belirtilen dizine kaydeder.
+    
+    crypto verilirse (önceden kurulmuş GraphCrypto) yeniden kurulmaz;
+    verilmezse seed başına önbelleklenmiş örnek kullanılır.
+    
+    layout: Graf çizimi için düğüm yerleşimi.
+        - "spectral": Normalize Laplacian özvektörleri (varsayılan, hızlı; genel bakış için yeterli)
+        - "random": Rastgele (seed=42), en ucuz
+        - "spring": Fruchterman–Reingold, en okunaklı ama O(iterasyon·N²);
+          sonuç output_dir/.pos_<hash>.npy olarak önbelleklenir
+    graph_dpi: v_graph.png çözünürlüğü (önceden 150).
+    workers: Verilirse dört görsel bu kadar süreçte paralel çizilir.
+        Her süreç matplotlib'i yeniden yükleyebildiğinden (spawn) tek
+        çağrıda genelde kazanç yoktur; varsayılan sıralı çizimdir.
+    """
+    if layout not in ("spectral", "random", "spring"):
+        raise ValueError(f"Bilinmeyen layout: {layout}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    out = functools.partial(os.path.join, output_dir)
+
+    if crypto is None:
+        crypto = _build_crypto(seed)
+
+    # Komşuluk matrisi tek geçişte kurulur; dereceler ve kenar listesi ondan türetilir
+    n = crypto.graph.number_of_nodes()
+    adjacency = nx.to_numpy_array(crypto.graph, nodelist=range(n), dtype=np.int8)
+    degrees = adjacency.sum(axis=1, dtype=np.int32)
+    edges = np.argwhere(np.triu(adjacency, k=1))  # her kenar bir kez (u < v)
+    
+    # Graf yerleşimi ana süreçte bir kez hesaplanır
+    if layout == "spectral":
+        pos = spectral_layout(edges[:, 0], edges[:, 1], n)
+    elif layout == "random":
+        pos = np.random.RandomState(42).rand(n, 2).astype(np.float32)
+    else:
+        pos = _cached_spring_layout(edges, n, output_dir)
+
+    jobs = [
+        # 1. Graf Yapısı
+        (_render_graph, (out("v_graph.png"), pos, edges, degrees,
+                         f"Graf Yapısı (Seed: {seed})", graph_dpi)),
+        # 2. Topolojik Özellikler Isı Haritası (topo_bytes → 16x16)
+        (_save_heatmap, (crypto.topo_matrix, "magma", out("v_topo_heat.png"))),
+        # 3. S-box
+        (_save_heatmap, (crypto.sbox_matrix, "coolwarm", out("v_sbox_heat.png"))),
+        # 4. Permütasyon (Pi) Dağılımı
+        (_render_pi, (out("v_pi_plot.png"), crypto.pi)),
+    ]
+
+    if workers:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_dispatch, jobs))
+    else:
+        for job in jobs:
+            _dispatch(job)
 
     print(f"Görseller tamamlandı: {output_dir}")
 